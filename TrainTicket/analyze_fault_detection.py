@@ -6,20 +6,32 @@ This script analyzes EvoMaster test results to identify which injected faults we
 It outputs a detailed log file with detection results in a formatted report.
 
 Usage:
-    python analyze_fault_detection.py [generated_tests_folder] [output_log_file]
+    python analyze_fault_detection.py [--no-cache] [generated_tests_folder] [output_log_file]
     
 Default:
     - generated_tests_folder: ./generated_tests
     - output_log_file: ./fault_detection_report_<timestamp>.log
+    - --no-cache: scan every test file without reading or writing <generated_tests_folder>/.cache
 """
 
+import bisect
+import hashlib
+import io
 import json
+import mmap
 import os
 import re
 import sys
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import ijson  # optional: stream-parse report.json instead of loading it whole
+except ImportError:
+    ijson = None
 
 
 # Define all injected faults
@@ -86,13 +98,261 @@ INJECTED_FAULTS = [
     }
 ]
 
+# Precompiled patterns, built once at module load instead of per file / per match.
+# Test files are scanned as raw bytes (all patterns are ASCII), report.json values as str.
+TEST_DEF_RE = re.compile(rb'def (test_\w+)\(self\):')
+INJECTED_FAULTNAME_RE = re.compile(
+    rb'["\']isInjected["\']\s*:\s*[Tt]rue.*?["\']faultName["\']\s*:\s*["\'](\w+)["\']', re.DOTALL)
+# Lookup indexes over INJECTED_FAULTS, built once at module load
+FAULT_BY_NAME = {f['faultName']: f for f in INJECTED_FAULTS}
+FAULT_NAME_BYTES = {name: name.encode('ascii') for name in FAULT_BY_NAME}
+# Single alternation over all fault names (longest first), so each file is scanned once
+ALL_FAULTS_RE = re.compile('|'.join(re.escape(name) for name in sorted(FAULT_BY_NAME, key=len, reverse=True)))
+ALL_FAULTS_BYTES_RE = re.compile(ALL_FAULTS_RE.pattern.encode('ascii'))
+
+
+def _build_api_path_faults():
+    """Map each API path to the fault names exposed through it."""
+    mapping = defaultdict(list)
+    for fault in INJECTED_FAULTS:
+        for api in fault['api']:
+            path = api.split(' ', 1)[1]
+            if fault['faultName'] not in mapping[path]:
+                mapping[path].append(fault['faultName'])
+    return dict(mapping)
+
+
+API_PATH_FAULTS = _build_api_path_faults()
+API_PATHS = list(API_PATH_FAULTS)
+# Substrings shared by every fault name / every API path (common suffix / prefix).
+# Content containing neither cannot produce a detection, which a plain find() rules out
+# far more cheaply than the regex passes.
+FAULT_NAME_MARKER = os.path.commonprefix([name[::-1] for name in FAULT_BY_NAME])[::-1].encode('ascii')
+API_PATH_MARKER = os.path.commonprefix(API_PATHS).split('{', 1)[0].encode('ascii')
+# One capturing group per API path; match.lastindex - 1 indexes into API_PATHS
+ALL_API_PATHS_RE = re.compile('|'.join(
+    '(' + re.escape(path).replace(re.escape('{tripId}'), r'[^"\']+') + ')' for path in API_PATHS).encode('ascii'))
+
+# Below this many test files, scanning inline beats the cost of starting worker processes
+PARALLEL_MIN_FILES = 16
+
+# report.json files at least this large are stream-parsed with ijson (when installed) to
+# bound memory; smaller ones are parsed faster with json.load
+STREAM_JSON_MIN_BYTES = 64 * 1024 * 1024
+
+# Per-file scan results are cached here (relative to the test folder) between runs.
+# Bump SCAN_CACHE_VERSION whenever the scan result format changes.
+SCAN_CACHE_FILE = Path('.cache') / 'fault_scan.json'
+SCAN_CACHE_VERSION = 2
+
+
+def _scan_fingerprint():
+    """Identify the fault config and patterns a scan was made with, so a cache built
+    before INJECTED_FAULTS or a pattern was edited is discarded."""
+    config = repr((
+        SCAN_CACHE_VERSION,
+        INJECTED_FAULTS,
+        ALL_FAULTS_BYTES_RE.pattern,
+        ALL_API_PATHS_RE.pattern,
+        INJECTED_FAULTNAME_RE.pattern,
+        TEST_DEF_RE.pattern,
+    ))
+    return hashlib.sha256(config.encode('utf-8')).hexdigest()
+
+
+SCAN_FINGERPRINT = _scan_fingerprint()
+
+
+def _load_scan_cache(cache_file):
+    """Load cached scan results: file name -> ((mtime_ns, size), scan result)."""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('fingerprint') != SCAN_FINGERPRINT:
+            return {}
+        return {
+            name: ((stamp[0], stamp[1]), (
+                filename,
+                [(fault_name, dict(details)) for fault_name, details in detections],
+                test_count,
+                error,
+            ))
+            for name, (stamp, (filename, detections, test_count, error)) in cache['files'].items()
+        }
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Warning: Ignoring unreadable scan cache {cache_file}: {e}")
+        return {}
+
+
+def _save_scan_cache(cache_file, files):
+    """Persist scan results for the next run; failures only cost a rescan."""
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': SCAN_FINGERPRINT, 'files': files}, f)
+    except OSError as e:
+        print(f"Warning: Could not write scan cache {cache_file}: {e}")
+
+
+@contextmanager
+def _mapped_file(path):
+    """Memory-map a file read-only for bytes matching (empty files yield b'')."""
+    with open(path, 'rb') as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            yield b''
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _scan_test_file(path):
+    """Scan one test file; top-level so it can run in a worker process.
+    
+    Returns (filename, detections, test_count, error).
+    """
+    filename = os.path.basename(path)
+    try:
+        with _mapped_file(path) as content:
+            detections, test_count = _scan_test_content(content, filename)
+        return filename, detections, test_count, None
+    except Exception as e:
+        return filename, [], 0, str(e)
+
+
+def _scan_test_content(content, filename):
+    """Find fault detections in test file content.
+    
+    Returns (detections, test_count), detections being (fault_name, details) pairs in
+    the order they should be recorded. Details carry no timestamp, so results can be
+    cached across runs; the analyzer adds its own when merging.
+    """
+    detections = []
+    test_class = filename.replace('.py', '')
+    
+    # Offsets and names of all test method definitions, in file order
+    method_starts = []
+    method_names = []
+    for match in TEST_DEF_RE.finditer(content):
+        method_starts.append(match.start())
+        method_names.append(match.group(1).decode('ascii'))
+    
+    # Count test methods (only generated EvoMaster_* test suites are counted)
+    test_count = len(method_names) if filename.startswith('EvoMaster_') else 0
+    
+    # Skip the regex passes when no fault name or API path can occur in the file
+    if content.find(FAULT_NAME_MARKER) == -1 and content.find(API_PATH_MARKER) == -1:
+        return detections, test_count
+    
+    # Direct fault name match: one pass over the content for all faults
+    for match in ALL_FAULTS_BYTES_RE.finditer(content):
+        # Try to find the test method this belongs to
+        test_method = _find_containing_test_method(method_starts, method_names, match.start())
+        
+        detections.append((match.group().decode('ascii'), {
+            'source': filename,
+            'test_class': test_class,
+            'test_method': test_method or 'unknown'
+        }))
+    
+    # Check for isInjected pattern
+    if content.find(b'"isInjected": true') != -1:
+        # Find associated fault names
+        for match in INJECTED_FAULTNAME_RE.finditer(content):
+            found_fault = match.group(1).decode('ascii')
+            if found_fault in FAULT_BY_NAME:
+                test_method = _find_containing_test_method(method_starts, method_names, match.start())
+                detections.append((found_fault, {
+                    'source': filename,
+                    'test_class': test_class,
+                    'test_method': test_method or 'unknown'
+                }))
+    
+    # Check for API endpoint + 400 status code pattern
+    for api_match in ALL_API_PATHS_RE.finditer(content):
+        path = API_PATHS[api_match.lastindex - 1]
+        # Get surrounding context (500 chars before and after)
+        start = max(0, api_match.start() - 500)
+        end = min(len(content), api_match.end() + 500)
+        context = content[start:end]
+        
+        for fault_name in API_PATH_FAULTS[path]:
+            # Check for 400 status or fault indicators in context
+            if (b'400' in context or b'status": 0' in context or 
+                b'isInjected' in context or FAULT_NAME_BYTES[fault_name] in context):
+                test_method = _find_containing_test_method(method_starts, method_names, api_match.start())
+                detections.append((fault_name, {
+                    'source': filename,
+                    'test_class': test_class,
+                    'test_method': test_method or 'unknown',
+                    'api_path': path
+                }))
+    
+    return detections, test_count
+
+
+def _find_containing_test_method(method_starts, method_names, position):
+    """Find the test method that contains the given position."""
+    # Last test method definition starting before this position
+    index = bisect.bisect_right(method_starts, position) - 1
+    if index >= 0:
+        return method_names[index]
+    return None
+
+
+def _format_json_path(path):
+    """Render a JSON path tuple of keys and list indices, e.g. ('a', 0, 'b') -> 'a[0].b'."""
+    parts = []
+    for part in path:
+        if isinstance(part, int):
+            parts.append(f"[{part}]")
+        elif parts:
+            parts.append(f".{part}")
+        else:
+            parts.append(part)
+    return "".join(parts)
+
+
+class _JsonFrame:
+    """State of one open container while streaming report.json.
+    
+    key is the current key of an object, or the index of the next item of an array.
+    Detections are buffered per container (in document order) because isInjected
+    may only be seen after its siblings.
+    """
+    __slots__ = ('is_map', 'path', 'key', 'fields', 'detections')
+    
+    def __init__(self, is_map, path):
+        self.is_map = is_map
+        self.path = path
+        self.key = None if is_map else 0
+        self.fields = {}  # scalar values of an object, by key
+        self.detections = []  # (fault_name, details) pairs
+
+
+class _TeeWriter:
+    """Forward each write to several text streams, e.g. the report file and the console."""
+    
+    def __init__(self, *streams):
+        self.streams = streams
+    
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+        return len(text)
+
 
 class FaultDetectionAnalyzer:
-    def __init__(self, test_folder):
+    def __init__(self, test_folder, use_cache=True):
         self.test_folder = Path(test_folder)
+        self.use_cache = use_cache  # False never touches the scan cache, e.g. for read-only folders
         self.detected_faults = defaultdict(list)  # fault_name -> list of detection details
+        self._seen = set()  # (fault_name, source, test_method) already recorded
+        self._seen_methods = set()  # (fault_name, test_method) already recorded, from any source
         self.total_test_cases = 0
         self.experiment_name = f"trainticket_evomaster_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        self._now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # timestamp for all detections
         self.tracking_started = None
         self.report_json_data = None
         
@@ -100,7 +360,6 @@ class FaultDetectionAnalyzer:
         """Run all analysis methods."""
         self._analyze_report_json()
         self._analyze_test_files()
-        self._count_test_cases()
         
     def _analyze_report_json(self):
         """Analyze the report.json file for fault detection."""
@@ -110,6 +369,12 @@ class FaultDetectionAnalyzer:
             return
         
         try:
+            # Streaming trades CPU for memory: json.load is faster, so only stream huge reports
+            if ijson is not None and report_path.stat().st_size >= STREAM_JSON_MIN_BYTES:
+                with open(report_path, 'rb', buffering=1 << 16) as f:
+                    self._stream_json_for_faults(f, "report.json")
+                return
+            
             with open(report_path, 'r', encoding='utf-8') as f:
                 self.report_json_data = json.load(f)
             
@@ -121,7 +386,52 @@ class FaultDetectionAnalyzer:
         except Exception as e:
             print(f"Warning: Error reading report.json: {e}")
     
-    def _search_json_for_faults(self, obj, source, path=""):
+    def _stream_json_for_faults(self, f, source):
+        """Search JSON for fault indicators from ijson events, without building the document."""
+        frames = []  # one _JsonFrame per open container, innermost last
+        for _, event, value in ijson.parse(f):
+            if event == 'map_key':
+                frames[-1].key = value
+                continue
+            if event in ('end_map', 'end_array'):
+                frame = frames.pop()
+                # Check for isInjected flag once all sibling keys have been seen
+                if frame.is_map and frame.fields.get('isInjected') == True:
+                    frame.detections.insert(0, (frame.fields.get('faultName', 'UNKNOWN'), {
+                        'source': source,
+                        'path': _format_json_path(frame.path),
+                        'message': frame.fields.get('message', ''),
+                        'details': frame.fields.get('details', ''),
+                        'timestamp': self._now_str
+                    }))
+                if frames:
+                    frames[-1].detections.extend(frame.detections)
+                else:
+                    for fault_name, details in frame.detections:
+                        self._record_detection(fault_name, details)
+                continue
+            
+            if not frames:
+                # Only a top-level object is searched
+                if event != 'start_map':
+                    return
+                frames.append(_JsonFrame(True, ()))
+                continue
+            
+            parent = frames[-1]
+            child_path = parent.path + (parent.key,)
+            if not parent.is_map:
+                parent.key += 1
+            
+            if event in ('start_map', 'start_array'):
+                frames.append(_JsonFrame(event == 'start_map', child_path))
+            elif parent.is_map:
+                parent.fields[parent.key] = value
+                # Check for fault name in string values
+                if event == 'string':
+                    parent.detections.extend(self._string_fault_detections(value, source, child_path))
+    
+    def _search_json_for_faults(self, obj, source, path=()):
         """Recursively search JSON for fault indicators."""
         if isinstance(obj, dict):
             # Check for isInjected flag
@@ -129,144 +439,108 @@ class FaultDetectionAnalyzer:
                 fault_name = obj.get('faultName', 'UNKNOWN')
                 self._record_detection(fault_name, {
                     'source': source,
-                    'path': path,
+                    'path': _format_json_path(path),
                     'message': obj.get('message', ''),
                     'details': obj.get('details', ''),
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    'timestamp': self._now_str
                 })
             
             # Check for fault name in string values
             for key, value in obj.items():
                 if isinstance(value, str):
-                    for fault in INJECTED_FAULTS:
-                        if fault['faultName'] in value:
-                            self._record_detection(fault['faultName'], {
-                                'source': source,
-                                'path': f"{path}.{key}" if path else key,
-                                'context': value[:200],
-                                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            })
+                    for fault_name, details in self._string_fault_detections(value, source, path + (key,)):
+                        self._record_detection(fault_name, details)
                 else:
-                    self._search_json_for_faults(value, source, f"{path}.{key}" if path else key)
+                    self._search_json_for_faults(value, source, path + (key,))
         elif isinstance(obj, list):
             for i, item in enumerate(obj):
-                self._search_json_for_faults(item, source, f"{path}[{i}]")
+                self._search_json_for_faults(item, source, path + (i,))
+    
+    def _string_fault_detections(self, value, source, path):
+        """Build a detection for every injected fault named in a JSON string value."""
+        fault_names = dict.fromkeys(ALL_FAULTS_RE.findall(value))
+        if not fault_names:
+            return []
+        path_str = _format_json_path(path)
+        return [(fault_name, {
+            'source': source,
+            'path': path_str,
+            'context': value[:200],
+            'timestamp': self._now_str
+        }) for fault_name in fault_names]
     
     def _analyze_test_files(self):
-        """Analyze generated test files for fault-related patterns."""
-        test_files = list(self.test_folder.glob("*.py"))
+        """Analyze generated test files for fault-related patterns and count test cases."""
+        # file name -> path; names key the cache, so it survives the folder being given differently
+        test_files = {
+            test_file.name: str(test_file) for test_file in self.test_folder.glob("*.py")
+            if not (test_file.name.startswith('__') or test_file.name == 'em_test_utils.py')
+        }
         
-        for test_file in test_files:
-            if test_file.name.startswith('__') or test_file.name == 'em_test_utils.py':
-                continue
-            
+        # Reuse cached results for files whose (mtime, size) is unchanged since the last run
+        cache_file = self.test_folder / SCAN_CACHE_FILE
+        cache = _load_scan_cache(cache_file) if self.use_cache else {}
+        stamps = {}
+        pending = []
+        for name, path in test_files.items():
             try:
-                content = test_file.read_text(encoding='utf-8')
-                self._analyze_test_content(content, test_file.name)
-            except Exception as e:
-                print(f"Warning: Error reading {test_file.name}: {e}")
-    
-    def _analyze_test_content(self, content, filename):
-        """Analyze test file content for fault detections."""
-        # Find all test methods
-        test_methods = re.findall(r'def (test_\w+)\(self\):', content)
+                stat = os.stat(path)
+                stamps[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[name] = None
+            cached = cache.get(name)
+            if stamps[name] is None or cached is None or cached[0] != stamps[name]:
+                pending.append(name)
         
-        # Search for fault patterns
-        for fault in INJECTED_FAULTS:
-            fault_name = fault['faultName']
-            
-            # Direct fault name match
-            if fault_name in content:
-                # Find context around each match
-                for match in re.finditer(re.escape(fault_name), content):
-                    # Try to find the test method this belongs to
-                    test_method = self._find_containing_test_method(content, match.start())
-                    
-                    self._record_detection(fault_name, {
-                        'source': filename,
-                        'test_class': filename.replace('.py', ''),
-                        'test_method': test_method or 'unknown',
-                        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    })
-            
-            # Check for isInjected pattern
-            if '"isInjected": true' in content or "'isInjected': true" in content.lower():
-                # Find associated fault names
-                pattern = r'["\']isInjected["\']\s*:\s*[Tt]rue.*?["\']faultName["\']\s*:\s*["\'](\w+)["\']'
-                for match in re.finditer(pattern, content, re.DOTALL):
-                    found_fault = match.group(1)
-                    if found_fault == fault_name:
-                        test_method = self._find_containing_test_method(content, match.start())
-                        self._record_detection(fault_name, {
-                            'source': filename,
-                            'test_class': filename.replace('.py', ''),
-                            'test_method': test_method or 'unknown',
-                            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
-            
-            # Check for API endpoint + 400 status code pattern
-            for api in fault['api']:
-                method, path = api.split(' ', 1)
-                # Normalize path for regex
-                path_pattern = path.replace('{tripId}', r'[^"\']+').replace('/', r'/')
-                
-                # Look for the API path in the content
-                if re.search(path_pattern, content):
-                    # Check if there's a 400 status nearby or fault indication
-                    api_matches = list(re.finditer(path_pattern, content))
-                    for api_match in api_matches:
-                        # Get surrounding context (500 chars before and after)
-                        start = max(0, api_match.start() - 500)
-                        end = min(len(content), api_match.end() + 500)
-                        context = content[start:end]
-                        
-                        # Check for 400 status or fault indicators in context
-                        if ('400' in context or 'status": 0' in context or 
-                            'isInjected' in context or fault_name in context):
-                            test_method = self._find_containing_test_method(content, api_match.start())
-                            # Only record if not already recorded for this test method
-                            existing = [d for d in self.detected_faults.get(fault_name, []) 
-                                        if d.get('test_method') == test_method]
-                            if not existing:
-                                self._record_detection(fault_name, {
-                                    'source': filename,
-                                    'test_class': filename.replace('.py', ''),
-                                    'test_method': test_method or 'unknown',
-                                    'api_path': path,
-                                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                })
+        # Files are scanned independently; results are merged back in file order
+        pending_paths = [test_files[name] for name in pending]
+        if len(pending) < PARALLEL_MIN_FILES:
+            scanned = list(map(_scan_test_file, pending_paths))
+        else:
+            with ProcessPoolExecutor() as executor:
+                scanned = list(executor.map(_scan_test_file, pending_paths, chunksize=8))
+        for name, result in zip(pending, scanned):
+            cache[name] = (stamps[name], result)
+        
+        self._merge_scan_results(cache[name][1] for name in test_files)
+        
+        # Failed scans are not cached so they are retried next time
+        if self.use_cache:
+            _save_scan_cache(cache_file, {
+                name: cache[name] for name in test_files
+                if stamps[name] is not None and cache[name][1][3] is None
+            })
     
-    def _find_containing_test_method(self, content, position):
-        """Find the test method that contains the given position."""
-        # Find all test method definitions before this position
-        test_defs = list(re.finditer(r'def (test_\w+)\(self\):', content[:position]))
-        if test_defs:
-            return test_defs[-1].group(1)
-        return None
+    def _merge_scan_results(self, results):
+        """Merge per-file scan results into the detected faults and test case count."""
+        for filename, detections, test_count, error in results:
+            if error:
+                print(f"Warning: Error reading {filename}: {error}")
+                continue
+            
+            self.total_test_cases += test_count
+            for fault_name, details in detections:
+                details = dict(details, timestamp=self._now_str)
+                # API path matches only count for a test method not yet recorded for the fault.
+                # A match outside any test method looks up None, which is what report.json
+                # detections (they have no test method) were recorded under.
+                if 'api_path' in details:
+                    test_method = details['test_method']
+                    if (fault_name, None if test_method == 'unknown' else test_method) in self._seen_methods:
+                        continue
+                self._record_detection(fault_name, details)
     
     def _record_detection(self, fault_name, details):
         """Record a fault detection, avoiding duplicates."""
         # Check for duplicates
-        for existing in self.detected_faults[fault_name]:
-            if (existing.get('test_method') == details.get('test_method') and 
-                existing.get('source') == details.get('source')):
-                return  # Skip duplicate
+        key = (fault_name, details.get('source'), details.get('test_method'))
+        if key in self._seen:
+            return  # Skip duplicate
         
+        self._seen.add(key)
+        self._seen_methods.add((fault_name, details.get('test_method')))
         self.detected_faults[fault_name].append(details)
     
-    def _count_test_cases(self):
-        """Count total test cases in the generated files."""
-        test_files = list(self.test_folder.glob("EvoMaster_*.py"))
-        
-        for test_file in test_files:
-            try:
-                content = test_file.read_text(encoding='utf-8')
-                # Count test methods
-                test_methods = re.findall(r'def test_\w+\(self\):', content)
-                self.total_test_cases += len(test_methods)
-            except:
-                pass
-    
     def generate_progress_bar(self, percentage, width=50):
         """Generate a text-based progress bar."""
         filled = int(width * percentage / 100)
@@ -277,152 +551,157 @@ class FaultDetectionAnalyzer:
         """Generate the formatted fault detection report."""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
+        # Pair every fault with its detections and split detected / undetected in one pass
+        fault_detections = []
+        detected_list = []
+        undetected_list = []
+        for fault in INJECTED_FAULTS:
+            detections = self.detected_faults.get(fault['faultName'], [])
+            fault_detections.append((fault, detections))
+            (detected_list if detections else undetected_list).append((fault, detections))
+        
         # Calculate statistics
         total_faults = len(INJECTED_FAULTS)
-        detected_count = len([f for f in INJECTED_FAULTS if self.detected_faults.get(f['faultName'])])
-        undetected_count = total_faults - detected_count
+        detected_count = len(detected_list)
+        undetected_count = len(undetected_list)
         detection_percentage = (detected_count / total_faults * 100) if total_faults > 0 else 0
         
-        lines = []
+        buf = io.StringIO()
+        
+        def line(text=""):
+            buf.write(text)
+            buf.write("\n")
         
         # Header
-        lines.append("=" * 80)
-        lines.append("                    FAULT DETECTION SUMMARY REPORT")
-        lines.append("=" * 80)
-        lines.append("")
-        lines.append(f"Experiment:         {self.experiment_name}")
-        lines.append(f"Generated:          {timestamp}")
-        lines.append(f"Test Folder:        {self.test_folder}")
-        lines.append(f"Total Test Cases:   {self.total_test_cases}")
-        lines.append("")
+        line("=" * 80)
+        line("                    FAULT DETECTION SUMMARY REPORT")
+        line("=" * 80)
+        line()
+        line(f"Experiment:         {self.experiment_name}")
+        line(f"Generated:          {timestamp}")
+        line(f"Test Folder:        {self.test_folder}")
+        line(f"Total Test Cases:   {self.total_test_cases}")
+        line()
         
         # Fault Coverage Summary
-        lines.append("=" * 80)
-        lines.append("FAULT COVERAGE SUMMARY")
-        lines.append("=" * 80)
-        lines.append("")
-        lines.append(f"Total Injected Faults:    {total_faults}")
-        lines.append(f"Detected Faults:          {detected_count} ({detection_percentage:.1f}%)")
-        lines.append(f"Undetected Faults:        {undetected_count} ({100 - detection_percentage:.1f}%)")
-        lines.append("")
-        lines.append("Detection Progress:")
-        lines.append(self.generate_progress_bar(detection_percentage))
-        lines.append("")
+        line("=" * 80)
+        line("FAULT COVERAGE SUMMARY")
+        line("=" * 80)
+        line()
+        line(f"Total Injected Faults:    {total_faults}")
+        line(f"Detected Faults:          {detected_count} ({detection_percentage:.1f}%)")
+        line(f"Undetected Faults:        {undetected_count} ({100 - detection_percentage:.1f}%)")
+        line()
+        line("Detection Progress:")
+        line(self.generate_progress_bar(detection_percentage))
+        line()
         
         # Detected Faults Section
-        lines.append("=" * 80)
-        lines.append(f"DETECTED FAULTS ({detected_count})")
-        lines.append("=" * 80)
-        lines.append("")
+        line("=" * 80)
+        line(f"DETECTED FAULTS ({detected_count})")
+        line("=" * 80)
+        line()
         
-        detected_fault_num = 0
-        for fault in INJECTED_FAULTS:
+        for detected_fault_num, (fault, detections) in enumerate(detected_list, 1):
             fault_name = fault['faultName']
-            detections = self.detected_faults.get(fault_name, [])
+            line(f"{detected_fault_num}. {fault_name}")
+            line(f"   Service:       {fault['service']}")
+            line(f"   API:           {', '.join(fault['api'])}")
+            line(f"   Description:   {fault['description']}")
+            line(f"   Detections:    {len(detections)} time(s)")
+            line()
+            
+            # Show up to 5 detection details
+            for i, detection in enumerate(detections[:5], 1):
+                line(f"   Detection #{i}:")
+                if detection.get('test_class'):
+                    line(f"     Test Class:  {detection['test_class']}")
+                if detection.get('test_method'):
+                    line(f"     Test Method: {detection['test_method']}")
+                if detection.get('source') and not detection.get('test_class'):
+                    line(f"     Source:      {detection['source']}")
+                if detection.get('api_path'):
+                    line(f"     API Path:    {detection['api_path']}")
+                if detection.get('timestamp'):
+                    line(f"     Timestamp:   {detection['timestamp']}")
+                line()
+            
+            if len(detections) > 5:
+                line(f"   ... and {len(detections) - 5} more detection(s)")
+                line()
             
-            if detections:
-                detected_fault_num += 1
-                lines.append(f"{detected_fault_num}. {fault_name}")
-                lines.append(f"   Service:       {fault['service']}")
-                lines.append(f"   API:           {', '.join(fault['api'])}")
-                lines.append(f"   Description:   {fault['description']}")
-                lines.append(f"   Detections:    {len(detections)} time(s)")
-                lines.append("")
-                
-                # Show up to 5 detection details
-                for i, detection in enumerate(detections[:5], 1):
-                    lines.append(f"   Detection #{i}:")
-                    if detection.get('test_class'):
-                        lines.append(f"     Test Class:  {detection['test_class']}")
-                    if detection.get('test_method'):
-                        lines.append(f"     Test Method: {detection['test_method']}")
-                    if detection.get('source') and not detection.get('test_class'):
-                        lines.append(f"     Source:      {detection['source']}")
-                    if detection.get('api_path'):
-                        lines.append(f"     API Path:    {detection['api_path']}")
-                    if detection.get('timestamp'):
-                        lines.append(f"     Timestamp:   {detection['timestamp']}")
-                    lines.append("")
-                
-                if len(detections) > 5:
-                    lines.append(f"   ... and {len(detections) - 5} more detection(s)")
-                    lines.append("")
-                
-                lines.append("-" * 80)
-                lines.append("")
+            line("-" * 80)
+            line()
         
         if detected_count == 0:
-            lines.append("No faults were detected in this test run.")
-            lines.append("")
+            line("No faults were detected in this test run.")
+            line()
         
         # Undetected Faults Section
-        lines.append("=" * 80)
-        lines.append(f"UNDETECTED FAULTS ({undetected_count})")
-        lines.append("=" * 80)
-        lines.append("")
+        line("=" * 80)
+        line(f"UNDETECTED FAULTS ({undetected_count})")
+        line("=" * 80)
+        line()
         
-        undetected_fault_num = 0
-        for fault in INJECTED_FAULTS:
+        for undetected_fault_num, (fault, _) in enumerate(undetected_list, 1):
             fault_name = fault['faultName']
-            detections = self.detected_faults.get(fault_name, [])
-            
-            if not detections:
-                undetected_fault_num += 1
-                lines.append(f"{undetected_fault_num}. {fault_name}")
-                lines.append(f"   Service:       {fault['service']}")
-                lines.append(f"   API:           {', '.join(fault['api'])}")
-                lines.append(f"   Description:   {fault['description']}")
-                lines.append(f"   Status:        NOT DETECTED")
-                lines.append("")
-                lines.append(f"   Trigger Conditions:")
-                lines.append(f"     - Check if the API endpoint was tested")
-                lines.append(f"     - Verify authentication is working for admin endpoints")
-                lines.append(f"     - Consider increasing test duration")
-                lines.append("")
-                lines.append("-" * 80)
-                lines.append("")
+            line(f"{undetected_fault_num}. {fault_name}")
+            line(f"   Service:       {fault['service']}")
+            line(f"   API:           {', '.join(fault['api'])}")
+            line(f"   Description:   {fault['description']}")
+            line(f"   Status:        NOT DETECTED")
+            line()
+            line(f"   Trigger Conditions:")
+            line(f"     - Check if the API endpoint was tested")
+            line(f"     - Verify authentication is working for admin endpoints")
+            line(f"     - Consider increasing test duration")
+            line()
+            line("-" * 80)
+            line()
         
         if undetected_count == 0:
-            lines.append("All injected faults were detected! Excellent coverage.")
-            lines.append("")
+            line("All injected faults were detected! Excellent coverage.")
+            line()
         
         # Summary Statistics
-        lines.append("=" * 80)
-        lines.append("DETECTION STATISTICS")
-        lines.append("=" * 80)
-        lines.append("")
-        lines.append(f"{'Fault Name':<45} {'Status':<15} {'Count':<10}")
-        lines.append("-" * 70)
+        line("=" * 80)
+        line("DETECTION STATISTICS")
+        line("=" * 80)
+        line()
+        line(f"{'Fault Name':<45} {'Status':<15} {'Count':<10}")
+        line("-" * 70)
         
-        for fault in INJECTED_FAULTS:
+        for fault, detections in fault_detections:
             fault_name = fault['faultName']
-            detections = self.detected_faults.get(fault_name, [])
             status = "DETECTED" if detections else "NOT DETECTED"
             count = len(detections)
-            lines.append(f"{fault_name:<45} {status:<15} {count:<10}")
+            line(f"{fault_name:<45} {status:<15} {count:<10}")
         
-        lines.append("-" * 70)
-        lines.append(f"{'TOTAL':<45} {detected_count}/{total_faults:<14} {sum(len(d) for d in self.detected_faults.values()):<10}")
-        lines.append("")
+        line("-" * 70)
+        line(f"{'TOTAL':<45} {detected_count}/{total_faults:<14} {sum(len(d) for d in self.detected_faults.values()):<10}")
+        line()
         
         # Footer
-        lines.append("=" * 80)
-        lines.append("END OF REPORT")
-        lines.append("=" * 80)
-        
-        # Write report
-        report_content = "\n".join(lines)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(report_content)
+        line("=" * 80)
+        line("END OF REPORT")
+        buf.write("=" * 80)
         
-        # Also print to console (handle encoding for Windows)
+        # Write report to the log file and the console in one pass. The console copy
+        # replaces characters it cannot encode (e.g. on Windows) instead of failing.
+        stdout = sys.stdout
+        stdout.flush()
+        if hasattr(stdout, 'buffer'):
+            console = io.TextIOWrapper(stdout.buffer, encoding=stdout.encoding,
+                                       errors='replace', write_through=True)
+        else:
+            console = stdout
         try:
-            print(report_content)
-        except UnicodeEncodeError:
-            # Fallback for Windows console encoding issues
-            print(report_content.encode('ascii', 'replace').decode('ascii'))
-        print(f"\nReport saved to: {output_file}")
+            with open(output_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+                _TeeWriter(f, console).write(buf.getvalue())
+            console.write(f"\n\nReport saved to: {output_file}\n")
+        finally:
+            if console is not stdout:
+                console.detach()
         
         return detected_count, total_faults
 
@@ -434,10 +713,13 @@ def main():
     output_file = f"./fault_detection_report_{timestamp}.log"
     
     # Parse command line arguments
-    if len(sys.argv) > 1:
-        test_folder = sys.argv[1]
-    if len(sys.argv) > 2:
-        output_file = sys.argv[2]
+    args = sys.argv[1:]
+    use_cache = '--no-cache' not in args
+    args = [arg for arg in args if arg != '--no-cache']
+    if len(args) > 0:
+        test_folder = args[0]
+    if len(args) > 1:
+        output_file = args[1]
     
     # Ensure paths exist
     if not os.path.exists(test_folder):
@@ -445,7 +727,7 @@ def main():
         sys.exit(1)
     
     # Run analysis
-    analyzer = FaultDetectionAnalyzer(test_folder)
+    analyzer = FaultDetectionAnalyzer(test_folder, use_cache=use_cache)
     analyzer.analyze()
     detected, total = analyzer.generate_report(output_file)
     
@@ -14,52 +14,83 @@ Example:
 import yaml
 import re
 import sys
-from copy import deepcopy
 
+# Prefer the libyaml-backed loader/dumper; fall back to the pure-Python ones
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
 
-def fix_refs_in_obj(obj, service_name, fixed_count):
-    """Recursively fix $ref values in an object, replacing 'api_' with service_name."""
+
+# $ref prefixes rewritten to service-specific ones
+SCHEMAS_API_PREFIX = '#/components/schemas/api_'
+RB_API_PREFIX = '#/components/requestBodies/api_'
+RB_REF = re.compile(r'#/components/requestBodies/(.+)')
+
+HTTP_METHODS = ('get', 'post', 'put', 'delete', 'patch', 'options', 'head')
+
+
+def _clone(obj):
+    """Copy nested dicts/lists, sharing the (immutable) scalar leaves.
+    
+    Much cheaper than copy.deepcopy for parsed YAML, and still gives the dumper
+    distinct objects so it does not emit anchors/aliases for the copies.
+    """
     if isinstance(obj, dict):
-        for key, value in obj.items():
-            if key == '$ref' and isinstance(value, str):
-                # Check for api_ prefix patterns
-                patterns = [
-                    (r"#/components/schemas/api_", f"#/components/schemas/{service_name}_"),
-                    (r"#/components/requestBodies/api_", f"#/components/requestBodies/{service_name}_"),
-                ]
-                for pattern, replacement in patterns:
-                    if re.search(pattern, value):
-                        new_value = re.sub(pattern, replacement, value)
-                        obj[key] = new_value
+        return {key: _clone(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_clone(item) for item in obj]
+    return obj
+
+
+def fix_refs_in_obj(obj, schema_repl, rb_repl, fixed_count):
+    """Fix $ref values anywhere under obj, replacing the 'api_' prefixes.
+    
+    schema_repl and rb_repl are the service-specific replacements for
+    SCHEMAS_API_PREFIX and RB_API_PREFIX, built once per operation by the caller.
+    Walks the tree with an explicit stack rather than recursion, so deep specs
+    cannot hit the recursion limit.
+    """
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == '$ref' and isinstance(value, str):
+                    if value.startswith(SCHEMAS_API_PREFIX):
+                        node[key] = value.replace(SCHEMAS_API_PREFIX, schema_repl, 1)
+                        fixed_count[0] += 1
+                    elif value.startswith(RB_API_PREFIX):
+                        node[key] = value.replace(RB_API_PREFIX, rb_repl, 1)
                         fixed_count[0] += 1
-            else:
-                fix_refs_in_obj(value, service_name, fixed_count)
-    elif isinstance(obj, list):
-        for item in obj:
-            fix_refs_in_obj(item, service_name, fixed_count)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        elif isinstance(node, list):
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
 
 
 def fix_openapi_spec(input_file, output_file):
     """Fix the OpenAPI spec by replacing api_ prefixes with service-specific prefixes."""
     print(f"Loading {input_file}...")
     
-    with open(input_file, 'r', encoding='utf-8') as f:
-        spec = yaml.safe_load(f)
+    with open(input_file, 'r', encoding='utf-8', buffering=1 << 20) as f:
+        spec = yaml.load(f, Loader=_Loader)
     
     fixed_count = [0]
     
-    # Process each path
+    # Which services need which requestBodies: service_name -> set of base names
+    service_rb_mapping = {}
+    
+    # Process each path once: fix the $refs of every operation and, in the same
+    # pass, record the service-specific requestBody it now points at
     paths = spec.get('paths', {})
     for path, path_item in paths.items():
         if not isinstance(path_item, dict):
             continue
         
         # Process each HTTP method (get, post, put, delete, etc.)
-        for method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']:
-            if method not in path_item:
-                continue
-            
-            operation = path_item[method]
+        for method in HTTP_METHODS:
+            operation = path_item.get(method)
             if not isinstance(operation, dict):
                 continue
             
@@ -69,72 +100,27 @@ def fix_openapi_spec(input_file, output_file):
                 continue
             
             # Fix all $ref values in this operation
-            fix_refs_in_obj(operation, service_name, fixed_count)
-    
-    # Also fix any requestBodies that reference api_ schemas
-    request_bodies = spec.get('components', {}).get('requestBodies', {})
-    for rb_name, rb_value in list(request_bodies.items()):
-        # If the requestBody name starts with api_, we need to handle it differently
-        if rb_name.startswith('api_'):
-            # Find which service uses this requestBody and fix it
-            # For now, we'll look for the schema type and match it
-            pass
-    
-    print(f"Fixed {fixed_count[0]} schema references")
-    
-    # Now we need to also fix the requestBodies section
-    # Find all unique api_ requestBodies that are referenced
-    api_request_bodies = set()
-    for path, path_item in paths.items():
-        if not isinstance(path_item, dict):
-            continue
-        for method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']:
-            if method not in path_item:
-                continue
-            operation = path_item[method]
-            if not isinstance(operation, dict):
-                continue
-            
-            request_body = operation.get('requestBody', {})
-            if isinstance(request_body, dict):
-                ref = request_body.get('$ref', '')
-                if 'api_' in ref:
-                    api_request_bodies.add(ref)
-    
-    # Now we need to create the service-specific requestBodies
-    # by duplicating the api_ ones with the correct service name
-    components = spec.get('components', {})
-    request_bodies = components.get('requestBodies', {})
-    
-    # Build a mapping of which services need which requestBodies
-    service_rb_mapping = {}
-    for path, path_item in paths.items():
-        if not isinstance(path_item, dict):
-            continue
-        for method in ['get', 'post', 'put', 'delete', 'patch', 'options', 'head']:
-            if method not in path_item:
-                continue
-            operation = path_item[method]
-            if not isinstance(operation, dict):
-                continue
-            
-            service_name = operation.get('x-service-name')
-            if not service_name:
-                continue
+            schema_repl = f"#/components/schemas/{service_name}_"
+            rb_repl = f"#/components/requestBodies/{service_name}_"
+            fix_refs_in_obj(operation, schema_repl, rb_repl, fixed_count)
             
             request_body = operation.get('requestBody', {})
             if isinstance(request_body, dict):
                 ref = request_body.get('$ref', '')
                 # Check if it's already a service-specific ref (we just fixed it)
-                match = re.search(r'#/components/requestBodies/(.+)', ref)
+                match = RB_REF.search(ref)
                 if match:
                     rb_name = match.group(1)
                     if rb_name.startswith(service_name + '_'):
                         # Extract the base name (after service prefix)
                         base_name = rb_name[len(service_name) + 1:]
-                        if service_name not in service_rb_mapping:
-                            service_rb_mapping[service_name] = set()
-                        service_rb_mapping[service_name].add(base_name)
+                        service_rb_mapping.setdefault(service_name, set()).add(base_name)
+    
+    print(f"Fixed {fixed_count[0]} schema references")
+    
+    # Now we need to create the service-specific requestBodies
+    # by duplicating the api_ ones with the correct service name
+    request_bodies = spec.get('components', {}).get('requestBodies', {})
     
     # Create service-specific requestBodies based on api_ ones
     for service_name, base_names in service_rb_mapping.items():
@@ -144,13 +130,13 @@ def fix_openapi_spec(input_file, output_file):
             
             if api_rb_name in request_bodies and service_rb_name not in request_bodies:
                 # Copy the api_ requestBody to service-specific one
-                request_bodies[service_rb_name] = deepcopy(request_bodies[api_rb_name])
+                request_bodies[service_rb_name] = _clone(request_bodies[api_rb_name])
                 print(f"Created requestBody: {service_rb_name} from {api_rb_name}")
     
     # Write the fixed spec
     print(f"Writing fixed spec to {output_file}...")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        yaml.dump(spec, f, default_flow_style=False, allow_unicode=True, sort_keys=False, width=1000)
+    with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        yaml.dump(spec, f, Dumper=_Dumper, default_flow_style=False, allow_unicode=True, sort_keys=False, width=1000)
     
     print("Done!")
 